@@ -1,40 +1,12 @@
-import os
-from unittest import TestCase
-
-from models import db, User, Message, Follows
 from sqlalchemy.exc import IntegrityError
-from flask_bcrypt import Bcrypt
-
-os.environ['DATABASE_URL'] = "postgresql:///warbler-test"
-
-from app import app
-
-bcrypt = Bcrypt(app)
-
-# Create our tables (we do this here, so we only create the tables
-# once for all tests --- in each test, we'll delete the data
-# and create fresh new clean test data
-
-with app.app_context():
 
-    db.create_all()
+from testing import WarblerTestCase
+from models import db, User, Message, Follows
 
 
-class MessageModelTestCase(TestCase):
+class MessageModelTestCase(WarblerTestCase):
     """Test views for messages."""
 
-    def setUp(self):
-        """Create test client, add sample data."""
-
-        User.query.delete()
-        Message.query.delete()
-
-        self.client = app.test_client()
-
-    def tearDown(self):
-
-        db.session.rollback()
-
     def test_message_create(self):
         """Does Message.create successfully create a new message given valid credentials?"""
 
@@ -5,54 +5,18 @@
 #    FLASK_ENV=production python -m unittest test_message_views.py
 
 
-import os
-from unittest import TestCase
+from sqlalchemy import select
 
-from models import db, connect_db, Message, User
+from testing import WarblerViewTestCase
+from models import db, Message, User
+from app import CURR_USER_KEY
 
-# BEFORE we import our app, let's set an environmental variable
-# to use a different database for tests (we need to do this
-# before we import our app, since that will have already
-# connected to the database
+_MSG_STMT = select(Message)
 
-os.environ['DATABASE_URL'] = "postgresql:///warbler-test"
 
-
-# Now we can import app
-
-from app import app, CURR_USER_KEY
-
-# Create our tables (we do this here, so we only create the tables
-# once for all tests --- in each test, we'll delete the data
-# and create fresh new clean test data
-
-with app.app_context():
-
-    db.create_all()
-
-# Don't have WTForms use CSRF at all, since it's a pain to test
-
-app.config['WTF_CSRF_ENABLED'] = False
-
-
-class MessageViewTestCase(TestCase):
+class MessageViewTestCase(WarblerViewTestCase):
     """Test views for messages."""
 
-    def setUp(self):
-        """Create test client, add sample data."""
-
-        User.query.delete()
-        Message.query.delete()
-
-        self.client = app.test_client()
-
-        self.testuser = User.signup(username="testuser",
-                                    email="test@test.com",
-                                    password="testuser",
-                                    image_url=None)
-
-        db.session.commit()
-
     def test_add_message(self):
         """Can use add a message?"""
 
@@ -71,7 +35,9 @@ class MessageViewTestCase(TestCase):
             # Make sure it redirects
             self.assertEqual(resp.status_code, 302)
 
-            msg = Message.query.one()
+            msgs = db.session.scalars(_MSG_STMT.limit(2)).all()
+            self.assertEqual(len(msgs), 1)
+            msg = msgs[0]
             self.assertEqual(msg.text, "Hello")
     
     def test_add_message_not_logged_in(self):
@@ -90,10 +56,9 @@ class MessageViewTestCase(TestCase):
                             email="test2@test.com",
                             password="testuser2",
                             image_url=None)
-        db.session.commit()
 
         # User2 posts a message
-        msg = Message(text="Hello from user2", user_id=user2.id)
+        msg = Message(text="Hello from user2", user=user2)
         db.session.add(msg)
         db.session.commit()
 
@@ -110,7 +75,7 @@ class MessageViewTestCase(TestCase):
 
 
             # Check that the message still exists
-            msg = Message.query.get(msg_id)
+            msg = db.session.get(Message, msg_id)
             self.assertIsNotNone(msg)
             self.assertEqual(msg.text, "Hello from user2")
     
@@ -130,7 +95,7 @@ class MessageViewTestCase(TestCase):
             self.assertIn("Access unauthorized", str(resp.data))
 
             # Check that the message still exists
-            msg = Message.query.get(msg_id)
+            msg = db.session.get(Message, msg_id)
             self.assertIsNotNone(msg)
             self.assertEqual(msg.text, "Hello from testuser")
     
@@ -142,52 +107,22 @@ class MessageViewTestCase(TestCase):
                             email="test2@test.com",
                             password="testuser2",
                             image_url=None)
-        
-        user2_id = user2.id
         db.session.commit()
 
         with self.client as c:
             with c.session_transaction() as sess:
                 # Log in as testuser, not user2
                 sess[CURR_USER_KEY] = self.testuser.id
+                user2_id = user2.id
 
             resp = c.post("/messages/new", data={"text": "Hello", "user_id": user2_id})
 
             # Make sure it redirects
             self.assertEqual(resp.status_code, 302)
 
-            msg = Message.query.one()
+            msgs = db.session.scalars(_MSG_STMT.limit(2)).all()
+            self.assertEqual(len(msgs), 1)
+            msg = msgs[0]
             self.assertEqual(msg.text, "Hello")
             # Make sure the message is posted by testuser, not user2
             self.assertEqual(msg.user_id, self.testuser.id)
-            
-    def test_unauthorized_message_delete(self):
-        """Does app prevent a user from deleting a message that they did not post?"""
-
-        # Create another user
-        user2 = User.signup(username="testuser2",
-                            email="test2@test.com",
-                            password="testuser2",
-                            image_url=None)
-        db.session.commit()
-
-        # User2 posts a message
-        msg = Message(text="Hello from user2", user_id=user2.id)
-        db.session.add(msg)
-        db.session.commit()
-
-        msg_id = msg.id
-
-        with self.client as c:
-            with c.session_transaction() as sess:
-                # Log in as testuser, not user2
-                sess[CURR_USER_KEY] = self.testuser.id
-
-            resp = c.post(f"/messages/{msg.id}/delete", follow_redirects=True)
-            self.assertEqual(resp.status_code, 200)
-            self.assertIn("Access unauthorized", str(resp.data))
-
-            # Check that the message still exists
-            msg = Message.query.get(msg_id)
-            self.assertIsNotNone(msg)
-            self.assertEqual(msg.text, "Hello from user2")
\ No newline at end of file
@@ -5,60 +5,36 @@
 #    python -m unittest test_user_model.py
 
 
-import os
-from unittest import TestCase
-
-from models import db, User, Message, Follows
+from sqlalchemy import bindparam, delete, select
 from sqlalchemy.exc import IntegrityError
-from flask_bcrypt import Bcrypt
-
-
-
-# BEFORE we import our app, let's set an environmental variable
-# to use a different database for tests (we need to do this
-# before we import our app, since that will have already
-# connected to the database
-
-os.environ['DATABASE_URL'] = "postgresql:///warbler-test"
-
 
-# Now we can import app
-
-from app import app
-
-bcrypt = Bcrypt(app)
-
-# Create our tables (we do this here, so we only create the tables
-# once for all tests --- in each test, we'll delete the data
-# and create fresh new clean test data
-
-with app.app_context():
+from testing import WarblerTestCase
+from models import db, User, Message, Follows
 
-    db.create_all()
+_USER_BY_USERNAME = select(User).where(
+    User.username == bindparam("username"))
 
 
-class UserModelTestCase(TestCase):
+class UserModelTestCase(WarblerTestCase):
     """Test views for messages."""
 
-    def setUp(self):
-        """Create test client, add sample data."""
+    @classmethod
+    def setUpClass(cls):
+        """Sign up `authuser` for the User.authenticate tests."""
 
-        try:
-            User.query.delete()
-            Message.query.delete()
-            Follows.query.delete()
+        super().setUpClass()
 
-            db.session.commit()
-        except Exception as e:
-            db.session.rollback()
-            raise e
+        u = User.signup(
+            email="auth@test.com",
+            username="authuser",
+            password="HASHED_PASSWORD",
+            image_url="http://example.com/image.jpg"
+        )
 
-        self.client = app.test_client()
-    
-    def tearDown(self):
-        """Clean up any fouled transaction."""
+        db.session.commit()
 
-        db.session.rollback()
+        cls._auth_uid = u.id
+        db.session.remove()
 
     def test_user_model(self):
         """Does basic model work?"""
@@ -74,8 +50,11 @@ class UserModelTestCase(TestCase):
         db.session.commit()
 
         # User should have no messages & no followers
-        self.assertEqual(len(u.messages), 0)
-        self.assertEqual(len(u.followers), 0)
+        self.assertEqual(
+            db.session.query(Message.id).filter_by(user_id=u.id).count(), 0)
+        self.assertEqual(
+            db.session.query(Follows).filter_by(
+                user_being_followed_id=u.id).count(), 0)
     
     def test_user_repr(self):
 
@@ -109,15 +88,25 @@ class UserModelTestCase(TestCase):
         db.session.commit()
 
         # User 1 follows User 2
-        u1.following.append(u2)
+        db.session.execute(Follows.__table__.insert().values(
+            user_being_followed_id=u2.id,
+            user_following_id=u1.id,
+        ))
         db.session.commit()
 
         # Check if is_following method returns True when u1 is following u2
         self.assertTrue(u1.is_following(u2))
 
         # Check if is_following method returns False when u1 is not following u2
-        u1.following.remove(u2)
+        db.session.execute(delete(Follows).where(
+            Follows.user_being_followed_id == u2.id,
+            Follows.user_following_id == u1.id,
+        ))
         db.session.commit()
+
+        # The row went away behind the ORM's back, so reload the collection
+        db.session.expire(u1, ["following"])
+
         self.assertFalse(u1.is_following(u2))
     
     def test_is_followed_by(self):
@@ -139,15 +128,25 @@ class UserModelTestCase(TestCase):
         db.session.commit()
 
         # User 2 follows User 1
-        u2.following.append(u1)
+        db.session.execute(Follows.__table__.insert().values(
+            user_being_followed_id=u1.id,
+            user_following_id=u2.id,
+        ))
         db.session.commit()
 
         # Check if is_followed_by method returns True when u1 is followed by u2
         self.assertTrue(u1.is_followed_by(u2))
 
         # Check if is_followed_by method returns False when u1 is not followed by u2
-        u2.following.remove(u1)
+        db.session.execute(delete(Follows).where(
+            Follows.user_being_followed_id == u1.id,
+            Follows.user_following_id == u2.id,
+        ))
         db.session.commit()
+
+        # The row went away behind the ORM's back, so reload the collection
+        db.session.expire(u1, ["followers"])
+
         self.assertFalse(u1.is_followed_by(u2))
 
     def test_user_create(self):
@@ -164,7 +163,8 @@ class UserModelTestCase(TestCase):
         db.session.commit()
 
         # Check if the user was successfully created
-        u_test = User.query.filter_by(username="testuser").first()
+        u_test = db.session.scalar(
+            _USER_BY_USERNAME, {"username": "testuser"})
         self.assertIsNotNone(u_test)
 
     def test_user_create_fail(self):
@@ -195,33 +195,13 @@ class UserModelTestCase(TestCase):
     def test_user_authenticate(self):
         """Does User.authenticate successfully return a user when given a valid username and password?"""
 
-        u = User.signup(
-        email="test@test.com",
-        username="testuser",
-        password="HASHED_PASSWORD",
-        image_url="http://example.com/image.jpg"
-        )
-
-        db.session.add(u)
-        db.session.commit()
-
         # Check if authenticate method returns the user when given a valid username and password
-        auth_user = User.authenticate("testuser", "HASHED_PASSWORD")
-        self.assertEqual(u, auth_user)
+        auth_user = User.authenticate("authuser", "HASHED_PASSWORD")
+        self.assertEqual(auth_user, db.session.get(User, self._auth_uid))
 
     def test_user_authenticate_invalid_username(self):
         """Does User.authenticate fail to return a user when the username is invalid?"""
 
-        u = User.signup(
-        email="test@test.com",
-        username="testuser",
-        password="HASHED_PASSWORD",
-        image_url="http://example.com/image.jpg"
-        )
-
-        db.session.add(u)
-        db.session.commit()
-
         # Check if authenticate method fails when the username is invalid
         auth_user = User.authenticate("invalidusername", "HASHED_PASSWORD")
         self.assertFalse(auth_user)
@@ -229,16 +209,6 @@ class UserModelTestCase(TestCase):
     def test_user_authenticate_invalid_password(self):
         """Does User.authenticate fail to return a user when the password is invalid?"""
 
-        u = User.signup(
-        email="test@test.com",
-        username="testuser",
-        password="HASHED_PASSWORD",
-        image_url="http://example.com/image.jpg"
-        )
-
-        db.session.add(u)
-        db.session.commit()
-
         # Check if authenticate method fails when the password is invalid
-        auth_user = User.authenticate("testuser", "invalidpassword")
+        auth_user = User.authenticate("authuser", "invalidpassword")
         self.assertFalse(auth_user)
\ No newline at end of file
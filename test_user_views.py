@@ -1,37 +1,10 @@
-import os
-from unittest import TestCase
+from testing import WarblerViewTestCase
+from app import CURR_USER_KEY
 
-from models import db, connect_db, Message, User
 
-
-os.environ['DATABASE_URL'] = "postgresql:///warbler-test"
-
-from app import app, CURR_USER_KEY
-
-with app.app_context():
-
-    db.create_all()
-
-app.config['WTF_CSRF_ENABLED'] = False
-
-class UserViewTestCase(TestCase):
+class UserViewTestCase(WarblerViewTestCase):
     """Test views for users."""
 
-    def setUp(self):
-        """Create test client, add sample data."""
-
-        User.query.delete()
-        Message.query.delete()
-
-        self.client = app.test_client()
-
-        self.testuser = User.signup(username="testuser",
-                                    email="test@test.com",
-                                    password="testuser",
-                                    image_url=None)
-
-        db.session.commit()
-
     def test_show_following_logged_in(self):
         """When logged in, can user see the following pages for any user?"""
 
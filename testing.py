@@ -0,0 +1,235 @@
+"""Shared setup for Warbler tests."""
+
+# run the tests in parallel like:
+#
+#    python -m pytest -n auto
+#
+# each worker has its own in-memory SQLite database, or with
+# WARBLER_TEST_BACKEND=postgresql, its own copy of warbler-test
+
+import os
+from unittest import TestCase
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy.schema import CreateTable
+
+from models import db, bcrypt, User
+
+
+def _test_database_url():
+    """Return the URL of the database to run tests against.
+
+    By default this is an in-memory SQLite database: the models use
+    nothing Postgres-specific, and it saves a round-trip to a server
+    for every statement. Set WARBLER_TEST_BACKEND=postgresql to test
+    against warbler-test instead.
+
+    Under pytest-xdist each worker gets a database of its own; on
+    Postgres it is recreated from warbler-test as a template at the
+    start of every run, so it starts out with our tables and never
+    keeps a schema from before a model change.
+    """
+
+    backend = os.environ.get('WARBLER_TEST_BACKEND', 'sqlite')
+
+    if backend == 'sqlite':
+        return "sqlite://"
+
+    if backend != 'postgresql':
+        raise ValueError(
+            f"WARBLER_TEST_BACKEND must be 'sqlite' or 'postgresql', "
+            f"not {backend!r}")
+
+    worker = os.environ.get('PYTEST_XDIST_WORKER')
+
+    if not worker:
+        return "postgresql:///warbler-test"
+
+    name = f"warbler-test-{worker}"
+    engine = create_engine("postgresql:///postgres",
+                           isolation_level="AUTOCOMMIT")
+
+    with engine.connect() as conn:
+        conn.execute(text(f'DROP DATABASE IF EXISTS "{name}"'))
+        conn.execute(text(
+            f'CREATE DATABASE "{name}" TEMPLATE "warbler-test"'))
+
+    engine.dispose()
+
+    return f"postgresql:///{name}"
+
+
+# BEFORE we import our app, let's set an environmental variable
+# to use a different database for tests (we need to do this
+# before we import our app, since that will have already
+# connected to the database
+
+os.environ['DATABASE_URL'] = _test_database_url()
+
+
+# Now we can import app
+
+from app import app
+
+# Tests never need SQLAlchemy's change-tracking signals (this is read
+# each time changes are recorded, so setting it here is enough)
+
+app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+
+# Hash passwords with bcrypt's minimum cost; tests only need
+# signup/authenticate to round-trip, not slow hashes
+
+app.config['BCRYPT_LOG_ROUNDS'] = 4
+bcrypt.init_app(app)
+
+_tables_ready = False
+
+
+@compiles(CreateTable, "postgresql")
+def _create_unlogged_table(create, compiler, **kw):
+    """Create test tables UNLOGGED: their rows never need to survive a
+    crash, so Postgres can skip writing them to the WAL."""
+
+    sql = compiler.visit_create_table(create, **kw)
+    return sql.replace("CREATE TABLE", "CREATE UNLOGGED TABLE", 1)
+
+
+def _configure_sqlite(engine):
+    """Make SQLite behave like Postgres where our tests depend on it.
+
+    SQLite only checks foreign keys (and runs ON DELETE CASCADE) when
+    asked to. And pysqlite starts transactions on its own and only
+    before DML, which breaks SAVEPOINT; take that over so SQLAlchemy's
+    BEGIN is the one that counts.
+    """
+
+    @event.listens_for(engine, "connect")
+    def _connect(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+        dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
+    @event.listens_for(engine, "begin")
+    def _begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+
+def _truncate_all():
+    """Empty every table in one statement (on Postgres).
+
+    Tests never commit, but the database may still hold rows left over
+    from earlier runs or from development, which would clash with the
+    fixtures the test classes create.
+    """
+
+    with db.engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            tables = ", ".join(t.name for t in db.metadata.sorted_tables)
+            conn.execute(text(
+                f"TRUNCATE {tables} RESTART IDENTITY CASCADE"))
+        else:
+            for table in reversed(db.metadata.sorted_tables):
+                conn.execute(table.delete())
+
+
+class WarblerTestCase(TestCase):
+    """Base class for Warbler tests.
+
+    Each test class runs in a single app context. Our tables are
+    created (and emptied) the first time any test class is set up, so
+    this happens once per process rather than once per test module.
+
+    Each test class runs inside one outer transaction that is never
+    committed, and each test inside a SAVEPOINT of it; `db.session` is
+    swapped for a session that joins that transaction, so commits made
+    by tests (and by the app's views) only release a nested SAVEPOINT.
+    Rolling back in `tearDown` is all the cleanup a test needs.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        global _tables_ready
+
+        cls._app_ctx = app.app_context()
+        cls._app_ctx.push()
+
+        if not _tables_ready:
+            if db.engine.dialect.name == "sqlite":
+                _configure_sqlite(db.engine)
+
+            # connect_db has already built the engine from app.py's
+            # config, so turn SQL logging off on the engine itself
+            db.engine.echo = False
+
+            db.create_all()
+            _truncate_all()
+            _tables_ready = True
+
+        cls._connection = db.engine.connect()
+        cls._transaction = cls._connection.begin()
+
+        cls._app_session = db.session
+        db.session = scoped_session(sessionmaker(
+            bind=cls._connection,
+            join_transaction_mode="create_savepoint",
+            expire_on_commit=False,
+        ))
+
+        cls.client = app.test_client()
+
+    @classmethod
+    def tearDownClass(cls):
+        db.session.remove()
+        db.session = cls._app_session
+
+        cls._transaction.rollback()
+        cls._connection.close()
+
+        cls._app_ctx.pop()
+
+    def setUp(self):
+        """Start a SAVEPOINT to roll this test back to, and log out
+        the shared test client."""
+
+        self._savepoint = self._connection.begin_nested()
+
+        self.client.delete_cookie(app.config['SESSION_COOKIE_NAME'])
+
+    def tearDown(self):
+        """Throw away everything this test did."""
+
+        db.session.remove()
+        self._savepoint.rollback()
+
+
+class WarblerViewTestCase(WarblerTestCase):
+    """Base class for view tests.
+
+    Signs up `testuser` once per class, in the class transaction, so it
+    survives every test's rollback; each test gets it as
+    `self.testuser`.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        # Don't have WTForms use CSRF at all, since it's a pain to test
+
+        app.config['WTF_CSRF_ENABLED'] = False
+
+        testuser = User.signup(username="testuser",
+                               email="test@test.com",
+                               password="testuser",
+                               image_url=None)
+
+        db.session.commit()
+
+        cls._testuser_id = testuser.id
+        db.session.remove()
+
+    def setUp(self):
+        super().setUp()
+
+        self.testuser = db.session.get(User, self._testuser_id)